@@ -30,6 +30,8 @@ std::unique_ptr<Pass> createOptimizeDotOperandsPass();
 
 std::unique_ptr<Pass> createOptimizeThreadLocalityPass();
 
+std::unique_ptr<Pass> createFinalizePass();
+
 } // namespace gpu
 } // namespace triton
 
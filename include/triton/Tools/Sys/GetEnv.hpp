@@ -42,6 +42,7 @@ inline const std::set<std::string> ENV_VARS = {
     "TRITON_DISABLE_RESHAPE_ENCODING_INFERENCE",
     "MLIR_ENABLE_DIAGNOSTICS",
     "TRITON_ENABLE_LLVM_DEBUG",
+    "TRITON_PTX_PEEPHOLE",
 };
 
 namespace tools {
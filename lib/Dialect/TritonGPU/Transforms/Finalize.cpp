@@ -0,0 +1,44 @@
+#include "mlir/IR/PatternMatch.h"
+#include "mlir/Pass/Pass.h"
+#include "mlir/Pass/PassManager.h"
+#include "mlir/Transforms/GreedyPatternRewriteDriver.h"
+#include "mlir/Transforms/Passes.h"
+#include "triton/Dialect/TritonGPU/IR/Dialect.h"
+#include "triton/Dialect/TritonGPU/Transforms/Passes.h"
+#define GEN_PASS_CLASSES
+#include "triton/Dialect/TritonGPU/Transforms/Passes.h.inc"
+
+using namespace mlir;
+
+class TritonGPUFinalizePass
+    : public TritonGPUFinalizeBase<TritonGPUFinalizePass> {
+public:
+  TritonGPUFinalizePass() = default;
+
+  void runOnOperation() override {
+    ModuleOp mod = getOperation();
+
+    // Canonicalize to a fixed point. Region simplification is part of the
+    // greedy driver, so dead-block cleanup happens in the same traversal.
+    RewritePatternSet patterns(&getContext());
+    for (Dialect *dialect : getContext().getLoadedDialects())
+      dialect->getCanonicalizationPatterns(patterns);
+    for (RegisteredOperationName op : getContext().getRegisteredOperations())
+      op.getCanonicalizationPatterns(patterns, &getContext());
+    if (failed(applyPatternsAndFoldGreedily(mod, std::move(patterns))))
+      signalPassFailure();
+
+    // CSE and symbol DCE run as a nested dynamic pipeline so the whole
+    // cleanup accounts for a single entry (and a single verifier run) in the
+    // outer pass manager.
+    OpPassManager pm(mod.getOperationName());
+    pm.addPass(createCSEPass());
+    pm.addPass(createSymbolDCEPass());
+    if (failed(runPipeline(pm, mod)))
+      signalPassFailure();
+  }
+};
+
+std::unique_ptr<Pass> mlir::triton::gpu::createFinalizePass() {
+  return std::make_unique<TritonGPUFinalizePass>();
+}
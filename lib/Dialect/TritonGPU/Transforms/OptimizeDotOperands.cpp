@@ -323,10 +323,10 @@ public:
     MLIRContext *context = &getContext();
     ModuleOp m = getOperation();
 
-    mlir::PassManager pm(m.getContext());
-    pm.addPass(mlir::createCanonicalizerPass());
-    auto ret = pm.run(m);
-
+    // Single greedy application: the dot-operand rewrites run interleaved
+    // with the ConvertLayoutOp canonicalization patterns below and the
+    // driver folds ops as it goes, so the former module-wide canonicalizer
+    // pre-pass (an extra full IR traversal per invocation) is not needed.
     mlir::RewritePatternSet patterns(context);
     patterns.add<SwizzleShmemConvert>(context);
     if (triton::gpu::TritonGPUDialect::getComputeCapability(m) >= 80)
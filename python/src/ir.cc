@@ -191,7 +191,14 @@ void init_triton_ir(py::module &&m) {
       .value("NONE", PropagateNan::NONE)
       .value("ALL", PropagateNan::ALL);
 
-  py::class_<MLIRContext>(m, "context", py::module_local()).def(py::init<>());
+  py::class_<MLIRContext>(m, "context", py::module_local())
+      .def(py::init([]() {
+        // Start single-threaded: Triton modules typically hold a single
+        // tt.func, so MLIR's default thread pool is startup cost without a
+        // matching win. pass_manager.enable_threading opts back in
+        // (TRITON_PM_THREADS=1) and re-creates the pool on demand.
+        return std::make_unique<MLIRContext>(MLIRContext::Threading::DISABLED);
+      }));
 
   m.def("load_dialects", [](MLIRContext &context) {
     DialectRegistry registry;
@@ -461,6 +468,31 @@ void init_triton_ir(py::module &&m) {
                return py::none();
              return py::int_(ret.getInt());
            })
+      .def("has_op",
+           [](ModuleOp &self, const std::string &opName) -> bool {
+             // cheap containment query used to specialize pass pipelines per
+             // workload; stops at the first match
+             bool found = false;
+             self.walk([&](Operation *op) {
+               if (op->getName().getStringRef() == opName) {
+                 found = true;
+                 return WalkResult::interrupt();
+               }
+               return WalkResult::advance();
+             });
+             return found;
+           })
+      .def("has_pipelinable_loop",
+           [](ModuleOp &self) -> bool {
+             // a loop whose body issues global loads -- the only shape the
+             // pipeline/prefetch passes can act on
+             bool found = false;
+             self.walk([&](scf::ForOp forOp) {
+               forOp->walk([&](triton::LoadOp) { found = true; });
+               return found ? WalkResult::interrupt() : WalkResult::advance();
+             });
+             return found;
+           })
       .def("walk",
            [](ModuleOp &self, const std::function<void(Operation *)> &fn) {
              self.walk(fn);
@@ -1521,6 +1553,16 @@ void init_triton_ir(py::module &&m) {
 
   py::class_<PassManager>(m, "pass_manager", py::module_local())
       .def(py::init<MLIRContext *>())
+      .def("enable_threading",
+           [](PassManager &self, bool enable) {
+             // Multi-threaded traversal of isolated-from-above ops. The
+             // context is constructed single-threaded, so passing true here
+             // is what actually spins up the thread pool. Callers must not
+             // enable this when MLIR_ENABLE_DUMP/MLIR_ENABLE_DIAGNOSTICS is
+             // set: those need the deterministic single-threaded order that
+             // enable_debug establishes.
+             self.getContext()->enableMultithreading(enable);
+           })
       .def("enable_debug",
            [](PassManager &self) {
              auto *context = self.getContext();
@@ -57,6 +57,7 @@ void init_triton_passes_ttgpuir(py::module &&m) {
                      createRemoveLayoutConversionsPass);
   ADD_PASS_WRAPPER_0("add_reduce_data_duplication",
                      createReduceDataDuplicationPass);
+  ADD_PASS_WRAPPER_0("add_finalize", createFinalizePass);
   ADD_PASS_WRAPPER_0("add_allocate_shared_memory",
                      createAllocateSharedMemoryPass);
 }
@@ -0,0 +1,113 @@
+# Unit tests for the opt-in PTX peephole (TRITON_PTX_PEEPHOLE) in the NVIDIA
+# backend. The rewrites are pure string transforms; no GPU is required.
+
+from triton.backends.nvidia.compiler import _branch_to_selp, _fuse_mul_add, _ptx_peephole
+
+
+def test_fuse_mul_add():
+    src = ("\tmul.f32 %f3, %f1, %f2;\n"
+           "\tadd.f32 %f4, %f3, %f0;\n")
+    out = _fuse_mul_add(src)
+    assert "fma.rn.f32 %f4, %f1, %f2, %f0;" in out
+    assert "mul.f32" not in out
+    assert "add.f32" not in out
+
+
+def test_fuse_mul_add_rn_f64():
+    src = ("\tmul.rn.f64 %fd3, %fd1, %fd2;\n"
+           "\tadd.rn.f64 %fd4, %fd0, %fd3;\n")
+    out = _fuse_mul_add(src)
+    assert "fma.rn.f64 %fd4, %fd1, %fd2, %fd0;" in out
+
+
+def test_fuse_mul_add_requires_single_use():
+    # %f3 is consumed twice by the add and once more below; both uses must
+    # keep the original mul
+    src = ("\tmul.f32 %f3, %f1, %f2;\n"
+           "\tadd.f32 %f4, %f3, %f3;\n"
+           "\tst.global.f32 [%rd1], %f3;\n")
+    assert _fuse_mul_add(src) == src
+
+
+def test_fuse_mul_add_skips_predicated():
+    src = ("\t@%p1 mul.f32 %f3, %f1, %f2;\n"
+           "\tadd.f32 %f4, %f3, %f0;\n")
+    assert _fuse_mul_add(src) == src
+
+
+def test_branch_to_selp():
+    src = ("\t@%p1 bra $L__BB0_2;\n"
+           "\tmov.f32 %f7, 0f3F800000;\n"
+           "\tbra.uni $L__BB0_3;\n"
+           "$L__BB0_2:\n"
+           "\tmov.f32 %f7, 0f00000000;\n"
+           "$L__BB0_3:\n")
+    out = _branch_to_selp(src)
+    # the branch is taken (-> second mov) when %p1 is set
+    assert "selp.f32 %f7, 0f00000000, 0f3F800000, %p1;" in out
+    assert "bra" not in out
+
+
+def test_branch_to_selp_negated_predicate():
+    src = ("\t@!%p2 bra OTHER;\n"
+           "\tmov.b32 %r1, 1;\n"
+           "\tbra.uni OTHER2;\n"
+           "OTHER:\n"
+           "\tmov.b32 %r1, 2;\n"
+           "OTHER2:\n")
+    out = _branch_to_selp(src)
+    # fall-through (-> first mov) when %p2 is set
+    assert "selp.b32 %r1, 1, 2, %p2;" in out
+
+
+def test_branch_to_selp_label_reuse_bails():
+    # $L__BB0_3 is also a branch target elsewhere; the diamond must survive
+    src = ("\t@%p0 bra $L__BB0_3;\n"
+           "\t@%p1 bra $L__BB0_2;\n"
+           "\tmov.f32 %f7, 0f3F800000;\n"
+           "\tbra.uni $L__BB0_3;\n"
+           "$L__BB0_2:\n"
+           "\tmov.f32 %f7, 0f00000000;\n"
+           "$L__BB0_3:\n")
+    assert _branch_to_selp(src) == src
+
+
+def test_branch_to_selp_vector_pack_bails():
+    # selp cannot take a vector pack operand; the mov pattern must not match
+    src = ("\t@%p1 bra $L__BB0_2;\n"
+           "\tmov.b32 %r1, {%h1, %h2};\n"
+           "\tbra.uni $L__BB0_3;\n"
+           "$L__BB0_2:\n"
+           "\tmov.b32 %r1, {%h3, %h4};\n"
+           "$L__BB0_3:\n")
+    assert _branch_to_selp(src) == src
+
+
+def test_branch_to_selp_special_register_bails():
+    # %tid.x is a special register, not a legal selp source
+    src = ("\t@%p1 bra $L__BB0_2;\n"
+           "\tmov.u32 %r1, %tid.x;\n"
+           "\tbra.uni $L__BB0_3;\n"
+           "$L__BB0_2:\n"
+           "\tmov.u32 %r1, %tid.y;\n"
+           "$L__BB0_3:\n")
+    assert _branch_to_selp(src) == src
+
+
+def test_branch_to_selp_symbol_operand_bails():
+    # address-of-symbol movs take generic addresses, which selp cannot select
+    src = ("\t@%p1 bra $L__BB0_2;\n"
+           "\tmov.u64 %rd5, __local_depot0;\n"
+           "\tbra.uni $L__BB0_3;\n"
+           "$L__BB0_2:\n"
+           "\tmov.u64 %rd5, global_table;\n"
+           "$L__BB0_3:\n")
+    assert _branch_to_selp(src) == src
+
+
+def test_peephole_respects_fp_fusion():
+    src = ("\tmul.rn.f32 %f3, %f1, %f2;\n"
+           "\tadd.rn.f32 %f4, %f3, %f0;\n")
+    # --fmad=false forbids contraction, so the peephole must not introduce it
+    assert _ptx_peephole(src, enable_fp_fusion=False) == src
+    assert "fma.rn.f32" in _ptx_peephole(src, enable_fp_fusion=True)
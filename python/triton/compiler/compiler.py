@@ -293,6 +293,35 @@ def make_backend(target):
     return actives[0](target)
 
 
+class LazyDict(dict):
+    '''
+    Mapping whose entries are materialized from loader thunks on first
+    access. The PTX/LLIR of a large kernel is hundreds of KB of text; most
+    launches never look at it, so reading and UTF-8-decoding it eagerly on
+    every CompiledKernel construction is wasted work.
+    '''
+
+    def __init__(self, loaders):
+        super().__init__((key, None) for key in loaders)
+        self._loaders = loaders
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if value is None:
+            value = self._loaders[key]()
+            self[key] = value
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
 class CompiledKernel:
 
     # Hooks for external tools to monitor the execution of triton kernels
@@ -313,10 +342,10 @@ class CompiledKernel:
         # stores the text of each level of IR that was generated during compilation
         asm_files = [Path(p) for c, p in metadata_group.items() if not c.endswith(".json")]
         binary_ext = make_backend(self.metadata.target).binary_ext
-        self.asm = {
-            file.suffix[1:]: file.read_bytes() if file.suffix[1:] == binary_ext else file.read_text()
+        self.asm = LazyDict({
+            file.suffix[1:]: file.read_bytes if file.suffix[1:] == binary_ext else file.read_text
             for file in asm_files
-        }
+        })
         self.kernel = self.asm[binary_ext]
         # binaries are lazily initialized
         # because it involves doing runtime things
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import builtins
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 from ..testing import do_bench
@@ -107,6 +109,24 @@ class Autotuner(KernelInterface):
         except OutOfResources:
             return [float("inf"), float("inf"), float("inf")]
 
+    def _precompile(self, args, kwargs, configs):
+        # Compile every candidate config before benchmarking. Independent
+        # configs do not share compiler state and ptxas runs as a subprocess
+        # that releases the GIL, so the sweep's compile time is bounded by
+        # the slowest config rather than the sum of all of them.
+        def compile_config(config):
+            self.fn.run(
+                *args,
+                num_warps=config.num_warps,
+                num_stages=config.num_stages,
+                num_ctas=config.num_ctas,
+                **{**kwargs, **config.kwargs, "warmup": True},
+            )
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for future in [pool.submit(compile_config, config) for config in configs]:
+                future.result()
+
     def run(self, *args, **kwargs):
         self.nargs = dict(zip(self.arg_names, args))
         if len(self.configs) > 1:
@@ -123,6 +143,8 @@ class Autotuner(KernelInterface):
             if key not in self.cache:
                 # prune configs
                 pruned_configs = self.prune_configs(kwargs)
+                if os.environ.get("TRITON_COMPILE_PARALLEL", "0") == "1" and len(pruned_configs) > 1:
+                    self._precompile(args, kwargs, pruned_configs)
                 bench_start = time.time()
                 timings = {config: self._bench(*args, config=config, **kwargs) for config in pruned_configs}
                 bench_end = time.time()
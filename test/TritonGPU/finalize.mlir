@@ -0,0 +1,45 @@
+// RUN: triton-opt %s -split-input-file -tritongpu-finalize | FileCheck %s
+
+// A no-op layout conversion folds away during the canonicalization sweep.
+// CHECK-LABEL: @fold_same_layout_convert
+// CHECK-SAME: (%[[ARG:.+]]: tensor<128xf32
+//   CHECK-NOT:   triton_gpu.convert_layout
+//       CHECK:   tt.return %[[ARG]]
+#blocked = #triton_gpu.blocked<{sizePerThread = [1], threadsPerWarp = [32], warpsPerCTA = [4], order = [0], CTAsPerCGA = [1], CTASplitNum = [1], CTAOrder = [0]}>
+module attributes {"triton_gpu.num-warps" = 4 : i32, "triton_gpu.num-ctas" = 1 : i32, "triton_gpu.compute-capability" = 80} {
+tt.func @fold_same_layout_convert(%arg0: tensor<128xf32, #blocked>) -> tensor<128xf32, #blocked> {
+    %0 = triton_gpu.convert_layout %arg0 : tensor<128xf32, #blocked> -> tensor<128xf32, #blocked>
+    tt.return %0 : tensor<128xf32, #blocked>
+}
+}  // end module
+
+// -----
+
+// Identical pure ops are merged by the nested CSE pass.
+// CHECK-LABEL: @cse_duplicate_add
+//       CHECK:   %[[SUM:.+]] = arith.addi %arg0, %arg1
+//   CHECK-NOT:   arith.addi
+//       CHECK:   tt.return %[[SUM]], %[[SUM]]
+module attributes {"triton_gpu.num-warps" = 4 : i32, "triton_gpu.num-ctas" = 1 : i32, "triton_gpu.compute-capability" = 80} {
+tt.func @cse_duplicate_add(%arg0: i32, %arg1: i32) -> (i32, i32) {
+    %0 = arith.addi %arg0, %arg1 : i32
+    %1 = arith.addi %arg0, %arg1 : i32
+    tt.return %0, %1 : i32, i32
+}
+}  // end module
+
+// -----
+
+// An unreferenced private function is removed by the nested symbol DCE pass.
+// CHECK-LABEL: module
+//   CHECK-NOT:   @dead_helper
+//       CHECK:   tt.func public @live
+//   CHECK-NOT:   @dead_helper
+module attributes {"triton_gpu.num-warps" = 4 : i32, "triton_gpu.num-ctas" = 1 : i32, "triton_gpu.compute-capability" = 80} {
+tt.func private @dead_helper(%arg0: i32) -> i32 {
+    tt.return %arg0 : i32
+}
+tt.func public @live() {
+    tt.return
+}
+}  // end module
@@ -1,6 +1,6 @@
 from triton.backends.compiler import BaseBackend
 from triton._C.libtriton import ir, passes, llvm, nvidia
-from triton.backends.nvidia.driver import CudaUtils
+from triton.runtime.cache import get_cache_manager
 
 from dataclasses import dataclass
 import functools
@@ -32,6 +32,120 @@ def _path_to_binary(binary: str):
     raise RuntimeError(f"Cannot find {binary}")
 
 
+# Compiled once at import; make_ptx runs these over multi-hundred-KB PTX
+# buffers on every compile.
+_ptx_kernel_name_re = re.compile(r"\.visible \.entry ([a-zA-Z_][a-zA-Z0-9_]*)")
+_ptx_version_re = re.compile(r'\.version \d+\.\d+')
+_ptx_debug_flag_re = re.compile(r",\s*debug|debug,\s*")
+
+
+# Peephole patterns for _ptx_peephole. Only unpredicated instructions match;
+# predicated lines start with '@' and fall through untouched.
+_ptx_mul_re = re.compile(r'^(\s*)mul(?:\.rn)?\.(f32|f64)\s+(%\w+),\s*(%\w+),\s*(%\w+);')
+_ptx_add_re = re.compile(r'^\s*add(?:\.rn)?\.(f32|f64)\s+(%\w+),\s*(%\w+),\s*(%\w+);')
+_ptx_pred_bra_re = re.compile(r'^(\s*)@(!?)(%p\w+)\s+bra(?:\.uni)?\s+([\w$]+);')
+_ptx_bra_re = re.compile(r'^\s*bra(?:\.uni)?\s+([\w$]+);')
+# the source operand must be a plain virtual register or an immediate: vector
+# packs like {%h1, %h2}, special registers like %tid.x and address-of-symbol
+# movs are not legal selp sources, so those diamonds are left alone
+_ptx_mov_re = re.compile(
+    r'^\s*mov\.(b16|b32|b64|s16|s32|s64|u16|u32|u64|f32|f64)\s+(%\w+),\s*(%\w+|0[fFdD][0-9a-fA-F]+|-?\d+);')
+_ptx_label_re = re.compile(r'^\s*([\w$]+):\s*$')
+
+
+def _token_count(text, token):
+    # occurrences of `token` not followed by an identifier character, so %f1
+    # does not count as a use of %f12
+    return len(re.findall(re.escape(token) + r'(?![0-9A-Za-z_$])', text))
+
+
+def _fuse_mul_add(ptx):
+    # mul.f32 t, a, b; add.f32 d, t, c  ->  fma.rn.f32 d, a, b, c
+    # when t has no use besides the adjacent add.
+    lines = ptx.split('\n')
+    out = []
+    i = 0
+    while i < len(lines):
+        mul = _ptx_mul_re.match(lines[i])
+        if mul and i + 1 < len(lines):
+            add = _ptx_add_re.match(lines[i + 1])
+            if add and add.group(1) == mul.group(2):
+                indent, ty, prod, lhs, rhs = mul.group(1), mul.group(2), mul.group(3), mul.group(4), mul.group(5)
+                dst, src0, src1 = add.group(2), add.group(3), add.group(4)
+                if prod in (src0, src1) and dst != prod and _token_count(ptx, prod) == 2:
+                    addend = src1 if src0 == prod else src0
+                    out.append(f"{indent}fma.rn.{ty} {dst}, {lhs}, {rhs}, {addend};")
+                    i += 2
+                    continue
+        out.append(lines[i])
+        i += 1
+    return '\n'.join(out)
+
+
+def _branch_to_selp(ptx):
+    # @p bra L; mov d, v1; bra M; L: mov d, v2; M:  ->  selp.<ty> d, v2, v1, p
+    # when L and M have no other references.
+    lines = ptx.split('\n')
+    out = []
+    i = 0
+    while i < len(lines):
+        if i + 5 < len(lines):
+            bra = _ptx_pred_bra_re.match(lines[i])
+            mov1 = _ptx_mov_re.match(lines[i + 1])
+            skip = _ptx_bra_re.match(lines[i + 2])
+            lab1 = _ptx_label_re.match(lines[i + 3])
+            mov2 = _ptx_mov_re.match(lines[i + 4])
+            lab2 = _ptx_label_re.match(lines[i + 5])
+            if (bra and mov1 and skip and lab1 and mov2 and lab2  #
+                    and lab1.group(1) == bra.group(4) and lab2.group(1) == skip.group(1)  #
+                    and mov1.group(1) == mov2.group(1) and mov1.group(2) == mov2.group(2)  #
+                    and _token_count(ptx, bra.group(4)) == 2 and _token_count(ptx, skip.group(1)) == 2):
+                indent, negated, pred = bra.group(1), bra.group(2), bra.group(3)
+                ty, dst = mov1.group(1), mov1.group(2)
+                taken, fallthrough = mov2.group(3), mov1.group(3)
+                if negated:
+                    taken, fallthrough = fallthrough, taken
+                out.append(f"{indent}selp.{ty} {dst}, {taken}, {fallthrough}, {pred};")
+                i += 6
+                continue
+        out.append(lines[i])
+        i += 1
+    return '\n'.join(out)
+
+
+def _ptx_peephole(ptx, enable_fp_fusion=True):
+    '''
+    Conservative PTX-level rewrites applied before ptxas: fuse isolated
+    mul+add pairs into fma.rn and collapse two-way branch diamonds over a
+    single register into selp. Opt-in via TRITON_PTX_PEEPHOLE=1. Contraction
+    is skipped when fp fusion is disabled: --fmad=false forbids exactly that
+    rewrite and ptxas cannot undo an explicit fma.rn.
+    '''
+    if enable_fp_fusion:
+        ptx = _fuse_mul_add(ptx)
+    return _branch_to_selp(ptx)
+
+
+def _mlir_debug_requested():
+    # mirrors tools::getBoolEnv, which enable_debug uses for these knobs
+    return any(
+        os.environ.get(var, "").lower() in ("on", "true", "1")
+        for var in ("MLIR_ENABLE_DUMP", "MLIR_ENABLE_DIAGNOSTICS"))
+
+
+def _enable_pm_threading(pm):
+    # ir.context() is constructed single-threaded, so Triton's usual
+    # single-tt.func modules don't pay for a thread pool they can't use;
+    # TRITON_PM_THREADS=1 opts in for multi-function modules, and the pool
+    # is shared by every stage run against the context. IR dumping and
+    # diagnostics need deterministic single-threaded order, so those knobs
+    # win over TRITON_PM_THREADS.
+    if _mlir_debug_requested():
+        return
+    if os.environ.get("TRITON_PM_THREADS", "0") == "1":
+        pm.enable_threading(True)
+
+
 @functools.lru_cache()
 def get_ptxas_version():
     version = subprocess.check_output([_path_to_binary("ptxas")[0], "--version"]).decode("utf-8")
@@ -54,6 +168,67 @@ def ptx_get_version(cuda_version) -> int:
     raise RuntimeError("Triton only support CUDA 10.0 or higher")
 
 
+@functools.lru_cache()
+def _ttgir_pass_recipe(capability, num_stages, num_warps, num_ctas, has_dot, has_pipelinable_loop):
+    '''
+    Resolved TTGIR pass list for a given (capability, options, workload)
+    combination. Autotune sweeps rebuild the same pipeline for every config;
+    caching the recipe replaces the per-compile branch dispatch with one dict
+    lookup and a flat iteration. Every entry takes (pm, cluster_info) because
+    PlanCTA mutates the cluster info that make_ttgir reads back into the
+    metadata. Kernels without tt.dot (elementwise, reductions) skip the
+    matmul-oriented passes, which would walk the module only to match
+    nothing.
+    '''
+    recipe = []
+
+    def add(add_fn, *args):
+        recipe.append(lambda pm, cluster_info: add_fn(pm, *args))
+
+    sm_major = capability // 10
+    add(passes.ttir.add_convert_to_ttgpuir, num_warps, 32, num_ctas, capability)
+    # optimize TTGIR
+    add(passes.ttgpuir.add_coalesce)
+    # TODO(Qingyi): Move PlanCTAPass to the front of CoalescePass
+    recipe.append(lambda pm, cluster_info: nvidia.passes.ttnvgpuir.add_plan_cta(pm, cluster_info))
+    add(passes.ttgpuir.add_remove_layout_conversions)
+    add(passes.ttgpuir.add_optimize_thread_locality)
+    if has_dot:
+        add(passes.ttgpuir.add_accelerate_matmul, capability)
+        # The remove-layout-conversions run that used to sit here was
+        # redundant: nothing between the post-coalesce run and the final
+        # pre-dedup run requires converts to be cleaned up eagerly, and each
+        # run walks the whole module.
+        add(passes.ttgpuir.add_optimize_dot_operands)
+    add(passes.common.add_cse)
+    # software pipelining and prefetching only ever fire on loops that load
+    # from global memory; skip both when no such loop exists
+    if sm_major >= 8 and has_pipelinable_loop:
+        add(passes.ttgpuir.add_pipeline, num_stages, num_warps, num_ctas, capability)
+    if sm_major <= 8 and has_dot and has_pipelinable_loop:
+        add(passes.ttgpuir.add_prefetch)
+    if has_dot:
+        add(passes.ttgpuir.add_optimize_dot_operands)
+    add(passes.ttgpuir.add_remove_layout_conversions)
+    add(passes.ttgpuir.add_reduce_data_duplication)
+    add(passes.ttgpuir.add_reorder_instructions)
+    if sm_major >= 9:
+        add(nvidia.passes.ttnvgpuir.add_fence_insertion)
+    # fused cse + symbol-dce + canonicalize tail
+    add(passes.ttgpuir.add_finalize)
+    return tuple(recipe)
+
+
+@functools.lru_cache()
+def _ptxas_and_ptx_version():
+    '''
+    Resolve the ptxas binary and the PTX version it supports once per process;
+    both make_ptx and make_cubin share this lookup.
+    '''
+    ptxas, cuda_version = _path_to_binary("ptxas")
+    return ptxas, ptx_get_version(cuda_version)
+
+
 @functools.lru_cache(None)
 def file_hash(path):
     with open(path, "rb") as f:
@@ -82,6 +257,10 @@ class CUDAOptions:
         assert self.num_warps > 0 and (self.num_warps & (self.num_warps - 1)) == 0, \
                "num_warps must be a power of 2"
 
+    # the dataclass is frozen and all fields are hashable after __post_init__,
+    # so equal option sets (the common case across autotune sweeps) share one
+    # digest computation
+    @functools.lru_cache()
     def hash(self):
         hash_dict = dict(self.__dict__)
         hash_dict["extern_libs"] = tuple((k, file_hash(v)) for k, v in sorted(hash_dict["extern_libs"]))
@@ -114,6 +293,7 @@ class CUDABackend(BaseBackend):
     def make_ttir(mod, metadata, opt):
         pm = ir.pass_manager(mod.context)
         pm.enable_debug()
+        _enable_pm_threading(pm)
         passes.common.add_inliner(pm)
         passes.ttir.add_rewrite_tensor_pointer(pm)
         passes.ttir.add_combine(pm)
@@ -135,30 +315,13 @@ class CUDABackend(BaseBackend):
         # TTIR -> TTGIR
         pm = ir.pass_manager(mod.context)
         pm.enable_debug()
-        passes.ttir.add_convert_to_ttgpuir(pm, opt.num_warps, 32, opt.num_ctas, capability)
-        # optimize TTGIR
-        passes.ttgpuir.add_coalesce(pm)
-        # TODO(Qingyi): Move PlanCTAPass to the front of CoalescePass
-        nvidia.passes.ttnvgpuir.add_plan_cta(pm, cluster_info)
-        passes.ttgpuir.add_remove_layout_conversions(pm)
-        passes.ttgpuir.add_optimize_thread_locality(pm)
-        passes.ttgpuir.add_accelerate_matmul(pm, capability)
-        passes.ttgpuir.add_remove_layout_conversions(pm)
-        passes.ttgpuir.add_optimize_dot_operands(pm)
-        passes.common.add_cse(pm)
-        if capability // 10 >= 8:
-            passes.ttgpuir.add_pipeline(pm, opt.num_stages, opt.num_warps, opt.num_ctas, capability)
-        if capability // 10 <= 8:
-            passes.ttgpuir.add_prefetch(pm)
-        passes.ttgpuir.add_optimize_dot_operands(pm)
-        passes.ttgpuir.add_remove_layout_conversions(pm)
-        passes.ttgpuir.add_reduce_data_duplication(pm)
-        passes.ttgpuir.add_reorder_instructions(pm)
-        passes.common.add_cse(pm)
-        passes.common.add_symbol_dce(pm)
-        if capability // 10 >= 9:
-            nvidia.passes.ttnvgpuir.add_fence_insertion(pm)
-        passes.common.add_canonicalizer(pm)
+        _enable_pm_threading(pm)
+        # cheap workload classification: interruptible walks over the TTIR
+        has_dot = mod.has_op("tt.dot")
+        has_pipelinable_loop = mod.has_pipelinable_loop()
+        for add_pass in _ttgir_pass_recipe(capability, opt.num_stages, opt.num_warps, opt.num_ctas, has_dot,
+                                           has_pipelinable_loop):
+            add_pass(pm, cluster_info)
         pm.run(mod)
         metadata["cluster_dims"] = (cluster_info.clusterDimX, cluster_info.clusterDimY, cluster_info.clusterDimZ)
         return mod
@@ -214,69 +377,83 @@ class CUDABackend(BaseBackend):
         ret = llvm.translate_to_asm(src, 'nvptx64-nvidia-cuda', proc, '', ['nvptx-short-ptr'], opt.enable_fp_fusion,
                                     False)
         # Find kernel names (there should only be one)
-        names = re.findall(r".visible .entry ([a-zA-Z_][a-zA-Z0-9_]*)", ret)
+        names = _ptx_kernel_name_re.findall(ret)
         assert len(names) == 1
         metadata["name"] = names[0]
         # post-process
         ptx_version = opt.ptx_version
         if ptx_version is None:
-            _, cuda_version = _path_to_binary("ptxas")
-            ptx_version = ptx_get_version(cuda_version)
+            _, ptx_version = _ptxas_and_ptx_version()
         ptx_version = f'{ptx_version//10}.{ptx_version%10}'
-        ret = re.sub(r'\.version \d+\.\d+', f'.version {ptx_version}', ret, flags=re.MULTILINE)
+        ret = _ptx_version_re.sub(f'.version {ptx_version}', ret)
         # Remove the debug flag that prevents ptxas from optimizing the code
-        ret = re.sub(r",\s*debug|debug,\s*", "", ret)
+        ret = _ptx_debug_flag_re.sub("", ret)
         return ret
 
     @staticmethod
     def make_cubin(src, metadata, opt, capability):
-        ptxas, _ = _path_to_binary("ptxas")
-        with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.ptx') as fsrc, \
-            tempfile.NamedTemporaryFile(delete=False, mode='r', suffix='.log') as flog:
+        if os.environ.get("TRITON_PTX_PEEPHOLE", "0") == "1":
+            src = _ptx_peephole(src, opt.enable_fp_fusion)
+        ptxas, _ = _ptxas_and_ptx_version()
+
+        line_info = [] if os.environ.get('TRITON_DISABLE_LINE_INFO') else ['-lineinfo']
+        fmad = [] if opt.enable_fp_fusion else ['--fmad=false']
+        opt_level = ['--opt-level', '0'] if os.environ.get("DISABLE_PTXAS_OPT", "0") == "1" else []
+        suffix = 'a' if capability == 90 else ''
+        # escape hatch for A/B-ing ptxas scheduling/codegen flags without
+        # patching the backend
+        extra_flags = os.environ.get("TRITON_PTXAS_FLAGS", "").split()
+        flags = line_info + fmad + opt_level + ['-v', f'--gpu-name=sm_{capability}{suffix}'] + extra_flags
+
+        # ptxas is deterministic for a given input and flag set, so identical
+        # PTX (common across reruns and across autotune configs that lower to
+        # the same code) maps to the same cubin. Key on the toolchain version
+        # as well so a ptxas upgrade misses.
+        cubin_key = hashlib.blake2b(f'{get_ptxas_version()}{" ".join(flags)}{src}'.encode("utf-8")).hexdigest()
+        cubin_cache = get_cache_manager(cubin_key)
+        cache_path = cubin_cache.get_file("kernel.cubin")
+        if cache_path is not None:
+            return Path(cache_path).read_bytes()
+
+        # ptxas requires a named, seekable input file, so the PTX still goes
+        # through a temp file; the shell and the stderr log file do not.
+        with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.ptx') as fsrc:
             fsrc.write(src)
-            fsrc.flush()
-            fbin = fsrc.name + '.o'
-
-            line_info = '' if os.environ.get('TRITON_DISABLE_LINE_INFO') else ' -lineinfo'
-            fmad = '' if opt.enable_fp_fusion else ' --fmad=false'
-            suffix = 'a ' if capability == 90 else ' '
-            if os.environ.get("DISABLE_PTXAS_OPT", "0") == "1":
-                cmd = f'{ptxas}{line_info}{fmad} -v --opt-level 0 --gpu-name=sm_{capability}{suffix}{fsrc.name} -o {fbin} 2> {flog.name}'
+        fbin = fsrc.name + '.o'
+
+        try:
+            subprocess.run([ptxas] + flags + [fsrc.name, '-o', fbin], check=True, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            log = e.stderr.decode("utf-8", errors="replace")
+            if e.returncode == 255:
+                raise RuntimeError(f'Internal Triton PTX codegen error: \n{log}')
+            elif e.returncode == 128 + signal.SIGSEGV:
+                raise RuntimeError(f'Please run `ptxas {fsrc.name}` to confirm that this is a bug in `ptxas`\n{log}')
             else:
-                cmd = f'{ptxas}{line_info}{fmad} -v --gpu-name=sm_{capability}{suffix}{fsrc.name} -o {fbin} 2> {flog.name}'
-
-            try:
-                subprocess.run(cmd, shell=True, check=True)
-            except subprocess.CalledProcessError as e:
-                with open(flog.name) as log_file:
-                    log = log_file.read()
-                if e.returncode == 255:
-                    raise RuntimeError(f'Internal Triton PTX codegen error: \n{log}')
-                elif e.returncode == 128 + signal.SIGSEGV:
-                    raise RuntimeError(
-                        f'Please run `ptxas {fsrc.name}` to confirm that this is a bug in `ptxas`\n{log}')
-                else:
-                    raise RuntimeError(f'`ptxas` failed with error code {e.returncode}: \n{log}')
-            finally:
-                if os.path.exists(fsrc.name):
-                    os.remove(fsrc.name)
-                if os.path.exists(flog.name):
-                    os.remove(flog.name)
-
-            with open(fbin, 'rb') as f:
-                cubin = f.read()
-            if os.path.exists(fbin):
-                os.remove(fbin)
+                raise RuntimeError(f'`ptxas` failed with error code {e.returncode}: \n{log}')
+        finally:
+            if os.path.exists(fsrc.name):
+                os.remove(fsrc.name)
+
+        with open(fbin, 'rb') as f:
+            cubin = f.read()
+        if os.path.exists(fbin):
+            os.remove(fbin)
+        cubin_cache.put(cubin, "kernel.cubin", binary=True)
         return cubin
 
     def add_stages(self, stages, options):
-        stages["ttir"] = lambda src, metadata: self.make_ttir(src, metadata, options)
-        stages["ttgir"] = lambda src, metadata: self.make_ttgir(src, metadata, options, self.capability)
-        stages["llir"] = lambda src, metadata: self.make_llir(src, metadata, options, self.capability)
-        stages["ptx"] = lambda src, metadata: self.make_ptx(src, metadata, options, self.capability)
-        stages["cubin"] = lambda src, metadata: self.make_cubin(src, metadata, options, self.capability)
+        # partials over the static stage methods share one code object across
+        # compiles instead of allocating five fresh closures per config
+        stages["ttir"] = functools.partial(self.make_ttir, opt=options)
+        stages["ttgir"] = functools.partial(self.make_ttgir, opt=options, capability=self.capability)
+        stages["llir"] = functools.partial(self.make_llir, options=options, capability=self.capability)
+        stages["ptx"] = functools.partial(self.make_ptx, opt=options, capability=self.capability)
+        stages["cubin"] = functools.partial(self.make_cubin, opt=options, capability=self.capability)
 
     @functools.lru_cache()
     def hash(self):
         version = get_ptxas_version()
-        return f'{version}-{self.capability}'
+        # TRITON_PTXAS_FLAGS changes the generated SASS, so it must
+        # invalidate the kernel cache like a toolchain change would
+        return f'{version}-{self.capability}-{os.environ.get("TRITON_PTXAS_FLAGS", "")}'
@@ -331,14 +331,28 @@ PyMODINIT_FUNC PyInit___triton_launcher(void) {{
     return src
 
 
+@functools.lru_cache(maxsize=1024)
+def _cached_launcher(constants_key, signature_items, ids_key):
+    # The generated launcher source depends only on the kernel signature and
+    # on which argument indices are constants. compile_module_from_src caches
+    # the .so on disk, but every call still re-renders the source, re-hashes
+    # it and re-imports the module; memoizing here collapses that to one
+    # compile per unique (signature, constants, ids) within the process.
+    constants = dict.fromkeys(constants_key)
+    signature = dict(signature_items)
+    ids = dict(ids_key)
+    src = make_launcher(constants, signature, ids)
+    mod = compile_module_from_src(src, "__triton_launcher")
+    return mod.launch
+
+
 class CudaLauncher(object):
 
     def __init__(self, src, metadata):
-        ids = {"ids_of_const_exprs": src.fn.constexprs if hasattr(src, "fn") else tuple()}
+        ids = {"ids_of_const_exprs": tuple(src.fn.constexprs) if hasattr(src, "fn") else tuple()}
         constants = src.constants if hasattr(src, "constants") else dict()
-        src = make_launcher(constants, src.signature, ids)
-        mod = compile_module_from_src(src, "__triton_launcher")
-        self.launch = mod.launch
+        self.launch = _cached_launcher(tuple(sorted(constants.keys())), tuple(src.signature.items()),
+                                       tuple(sorted(ids.items())))
 
     def __call__(self, *args, **kwargs):
         self.launch(*args, **kwargs)
@@ -351,11 +365,17 @@ class CudaDriver(GPUDriver):
         self.launcher_cls = CudaLauncher
         super().__init__()
 
+    @functools.lru_cache()
+    def _device_capability(self, device):
+        # get_device_capability crosses the Python<->CUDA-driver boundary and
+        # its result is fixed per device index for the life of the process, so
+        # only pay for the round-trip once even under autotune sweeps.
+        capability = self.get_device_capability(device)
+        return capability[0] * 10 + capability[1]
+
     def get_current_target(self):
         device = self.get_current_device()
-        capability = self.get_device_capability(device)
-        capability = capability[0] * 10 + capability[1]
-        return ("cuda", capability)
+        return ("cuda", self._device_capability(device))
 
     @staticmethod
     def is_active():